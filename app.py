@@ -1,9 +1,10 @@
 import streamlit as st
 import os
 import shutil
+from concurrent.futures.process import BrokenProcessPool
 from core.pdf_to_images import convert_pdf_to_images
-from core.medical_detector import detect_medical_pages
-from utils.zip_utils import create_zip
+from core.medical_detector import detect_medical_pages, ocr_executor
+from utils.zip_utils import open_zip
 import uuid
 
 if "session_id" not in st.session_state:
@@ -20,6 +21,8 @@ SESSION_ID = st.session_state.session_id
 BASE_DIR = os.path.join("temp", SESSION_ID)
 
 UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
+# private copy of the converted PDF; uploads may be overwritten later
+SOURCE_PDF = os.path.join(BASE_DIR, "source.pdf")
 IMAGE_DIR = os.path.join(BASE_DIR, "images")
 OUTPUT_DIR = os.path.join(BASE_DIR, "detected")
 
@@ -27,6 +30,15 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(IMAGE_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# ---------------- OCR POOL ----------------
+
+@st.cache_resource
+def get_pool():
+    # workers and their Tesseract handles survive script reruns.
+    # Shared across runs, so it is sized for the machine, not per PDF:
+    # ocr_pool's page-count cap does not apply here (chunksize still does)
+    return ocr_executor(os.cpu_count())
+
 st.set_page_config(
     page_title="PDF Analyzer",
     page_icon="",
@@ -110,8 +122,10 @@ if st.session_state.pdf_uploaded:
         def update_progress(p):
             progress.progress(int(p * 100))
 
+        shutil.copyfile(pdf_path, SOURCE_PDF)
+
         images = convert_pdf_to_images(
-            pdf_path,
+            SOURCE_PDF,
             IMAGE_DIR,
             progress_callback=update_progress
         )
@@ -125,23 +139,41 @@ if st.session_state.images_done:
 
     if st.button("Get Output Images"):
 
-        if os.path.exists(OUTPUT_DIR):
-            shutil.rmtree(OUTPUT_DIR)
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-
         progress = st.progress(0)
 
         def update_progress(p):
             progress.progress(int(p * 100))
 
-        found = detect_medical_pages(
-            IMAGE_DIR,
-            OUTPUT_DIR,
-            progress_callback=update_progress,
-            debug=True
-        )
-
-        zip_path = create_zip(OUTPUT_DIR, "medical_output")
+        def run_detection():
+            if os.path.exists(OUTPUT_DIR):
+                shutil.rmtree(OUTPUT_DIR)
+            os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+            # matched pages are added to the ZIP as soon as they are found
+            with open_zip(os.path.join(BASE_DIR, "medical_output")) as zf:
+                found = detect_medical_pages(
+                    IMAGE_DIR,
+                    OUTPUT_DIR,
+                    progress_callback=update_progress,
+                    debug=True,
+                    pdf_path=SOURCE_PDF,
+                    zip_writer=zf,
+                    pool=get_pool()
+                )
+            return found, zf.filename
+
+        # a crashed worker breaks the shared pool for every session:
+        # drop it from the cache and retry once on a fresh one
+        try:
+            found, zip_path = run_detection()
+        except BrokenProcessPool:
+            get_pool.clear()
+            try:
+                found, zip_path = run_detection()
+            except BrokenProcessPool:
+                get_pool.clear()
+                st.error("OCR worker crashed while processing this PDF. Please try again.")
+                st.stop()
 
         st.success(f"{len(found)} medical images detected")
 
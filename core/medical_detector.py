@@ -1,16 +1,24 @@
-import pytesseract
 import cv2
+import multiprocessing
 import os
 import re
 import shutil
-import hashlib
+import ahocorasick
 import numpy as np
+import xxhash
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from PIL import Image
+from tesserocr import PyTessBaseAPI, PSM, OEM
+from core.pdf_to_images import open_pdf, page_index, rerender_page
 
 # --------------------------------------------------
 # WINDOWS TESSERACT PATH
 # --------------------------------------------------
 # if os.name == "nt":
-#     pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+#     os.environ["TESSDATA_PREFIX"] = r"C:\Program Files\Tesseract-OCR\tessdata"
 
 
 # ---------------- STRUCTURED PDFS ----------------
@@ -92,18 +100,41 @@ BODY_RULES = {
 # TEXT CLEANING
 # --------------------------------------------------
 
+WHITESPACE_REGEX = re.compile(r"\s+")
+NON_FILENAME_REGEX = re.compile(r'[^a-z0-9_]')
+NON_ALPHA_REGEX = re.compile(r'[^a-z]')
+
+# OCR spacing fixes, applied in a single pass
+OCR_FIXES = {
+    "b p": "bp",
+    "b.p.": "bp",
+    "s p o 2": "spo2",
+    "t e m p": "temp",
+}
+OCR_FIX_REGEX = re.compile("|".join(re.escape(k) for k in OCR_FIXES))
+
+
 def normalize_text(text: str) -> str:
     text = text.lower()
-    text = re.sub(r"\s+", " ", text)
-    text = text.replace("b p", "bp")
-    text = text.replace("b.p.", "bp")
-    text = text.replace("s p o 2", "spo2")
-    text = text.replace("t e m p", "temp")
+    text = WHITESPACE_REGEX.sub(" ", text)
+    text = OCR_FIX_REGEX.sub(lambda m: OCR_FIXES[m.group(0)], text)
     return text
 
 
 def clean_filename(text):
-    return re.sub(r'[^a-z0-9_]', '', text.lower().replace(" ", "_"))
+    return NON_FILENAME_REGEX.sub('', text.lower().replace(" ", "_"))
+
+
+# --------------------------------------------------
+# PAGE LISTING
+# --------------------------------------------------
+
+def list_images(image_dir):
+    """
+    Directory entries sorted by name; entry.path avoids rebuilding paths
+    """
+    with os.scandir(image_dir) as it:
+        return sorted(it, key=lambda e: e.name)
 
 
 # --------------------------------------------------
@@ -111,43 +142,187 @@ def clean_filename(text):
 # --------------------------------------------------
 
 def image_hash(path):
+    h = xxhash.xxh3_64()
     with open(path, "rb") as f:
-        return hashlib.md5(f.read()).hexdigest()
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# --------------------------------------------------
+# OUTPUT
+# --------------------------------------------------
+
+def save_page(img_path, dst_path, doc=None, zip_writer=None):
+    """
+    Scratch renders are written with light, fast PNG compression. When
+    the source PDF is open, matched pages are re-rendered from it so the
+    archived copy is a normally compressed PNG.
+    With a zip_writer, the saved page is also added to the archive.
+    """
+    if doc is not None:
+        rerender_page(doc, page_index(img_path)).save(dst_path)
+    else:
+        # scratch pages are never modified, so a hardlink is enough
+        try:
+            os.link(img_path, dst_path)
+        except OSError:
+            shutil.copy(img_path, dst_path)
+
+    if zip_writer:
+        zip_writer.write(dst_path, arcname=os.path.basename(dst_path))
 
 
 # --------------------------------------------------
 # OCR CORE
 # --------------------------------------------------
 
-def ocr_image(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    gray = cv2.bilateralFilter(gray, 9, 75, 75)
+def has_ink(gray, min_frac=0.002, dst=None):
+    """
+    Cheap blank-region check: enough dark pixels to be worth OCR
+    """
+    _, bw = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY_INV, dst=dst)
+    return cv2.countNonZero(bw) > min_frac * gray.size
+
+
+class OcrWorker:
+    """
+    Holds one Tesseract API open so language data is loaded once per
+    process instead of once per OCR call, plus scratch buffers reused
+    by the preprocessing of every region.
+    """
+
+    def __init__(self):
+        self.api = PyTessBaseAPI(psm=PSM.SINGLE_BLOCK, oem=OEM.DEFAULT)
+        self._buffers = {}
+
+    def scratch(self, name, shape):
+        """
+        Contiguous uint8 view of a named buffer, grown when too small
+        """
+        size = shape[0] * shape[1]
+        buf = self._buffers.get(name)
+        if buf is None or buf.size < size:
+            buf = self._buffers[name] = np.empty(size, np.uint8)
+        return buf[:size].reshape(shape)
+
+    def preprocess(self, gray, scanned=False):
+        """
+        Image to hand to Tesseract, or None for a blank region
+        """
+        # blank region: skip both the filter and Tesseract
+        if not has_ink(gray, dst=self.scratch("ink", gray.shape)):
+            return None
+
+        # digital renders are noise-free; scans only need a light median
+        if scanned:
+            gray = cv2.medianBlur(gray, 3, dst=self.scratch("denoise", gray.shape))
 
-    return normalize_text(
-        pytesseract.image_to_string(gray, config="--oem 3 --psm 6")
+        return gray
+
+    def image_to_string(self, gray):
+        self.api.SetImage(Image.fromarray(gray))
+        return self.api.GetUTF8Text()
+
+    def ocr_gray(self, gray, scanned=False):
+        gray = self.preprocess(gray, scanned)
+        if gray is None:
+            return ""
+
+        return normalize_text(self.image_to_string(gray))
+
+
+_ocr_worker = None
+
+
+def init_ocr_worker():
+    """
+    Pool initializer: one OcrWorker per process
+    """
+    global _ocr_worker
+    _ocr_worker = OcrWorker()
+
+
+def get_ocr_worker():
+    if _ocr_worker is None:
+        init_ocr_worker()
+    return _ocr_worker
+
+
+def pool_sizing(n_pages):
+    """
+    (workers, chunksize) for OCR over n_pages. Each worker loads
+    Tesseract once in its initializer, so never start more workers than
+    there are pages, and keep chunks small enough that each one gets work.
+    """
+    workers = max(1, min(os.cpu_count() or 1, n_pages))
+    chunksize = max(1, n_pages // (workers * 4))
+    return workers, chunksize
+
+
+def ocr_executor(max_workers):
+    """
+    OCR process pool. Workers are spawned, not forked: the pool can be
+    created inside a multi-threaded server (Streamlit), where a forked
+    child may inherit a lock held by another thread. Nothing relies on
+    fork, since the initializer loads Tesseract in each worker.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_ocr_worker
     )
 
 
+def ocr_pool(n_pages, pool=None):
+    """
+    Process pool for page OCR, sized by pool_sizing.
+    A long-lived pool passed in by the caller is used as-is and left open.
+    """
+    if pool is not None:
+        return nullcontext(pool)
+
+    workers, _ = pool_sizing(n_pages)
+    return ocr_executor(workers)
+
+
+def ocr_gray(gray, scanned=False):
+    return get_ocr_worker().ocr_gray(gray, scanned)
+
+
 # --------------------------------------------------
 # REGION EXTRACTION
 # --------------------------------------------------
 
-def extract_header_text(img):
-    h, w = img.shape[:2]
-    header = img[0:int(h*0.22), :]
-    return ocr_image(header)
+# Header/footer classification only needs the document title, which
+# reads fine at half the 300 DPI scratch resolution. Body text does not,
+# so body and full-page OCR stay at full resolution.
+HEADLINE_SCALE = 0.5
+
+
+def headline_region(region):
+    return cv2.resize(
+        region, (0, 0), fx=HEADLINE_SCALE, fy=HEADLINE_SCALE,
+        interpolation=cv2.INTER_AREA
+    )
+
 
+def extract_header_text(gray, scanned=False):
+    h, w = gray.shape[:2]
+    header = gray[0:int(h*0.22), :]
+    return ocr_gray(headline_region(header), scanned)
 
-def extract_footer_text(img):
-    h, w = img.shape[:2]
-    footer = img[int(h*0.82):h, :]
-    return ocr_image(footer)
 
+def extract_footer_text(gray, scanned=False):
+    h, w = gray.shape[:2]
+    footer = gray[int(h*0.82):h, :]
+    return ocr_gray(headline_region(footer), scanned)
 
-def extract_body_text(img):
-    h, w = img.shape[:2]
-    body = img[int(h*0.22):int(h*0.80), :]
-    return ocr_image(body)
+
+def extract_body_text(gray, scanned=False):
+    h, w = gray.shape[:2]
+    body = gray[int(h*0.22):int(h*0.80), :]
+    return ocr_gray(body, scanned)
 
 
 # --------------------------------------------------
@@ -157,30 +332,69 @@ def extract_body_text(img):
 def is_header_weak(header_text):
     if not header_text:
         return True
-    cleaned = re.sub(r'[^a-z]', '', header_text)
+    cleaned = NON_ALPHA_REGEX.sub('', header_text)
     return len(cleaned) < 10
 
 
+# --------------------------------------------------
+# KEYWORD MATCHING
+# --------------------------------------------------
+
+def build_keyword_automaton(categories):
+    """
+    Aho-Corasick automaton over the keywords of every category, so a
+    page is scanned once instead of once per keyword.
+    Each keyword maps to (keyword, categories it belongs to).
+    """
+    owners = {}
+    for category, keywords in categories.items():
+        for kw in keywords:
+            owners.setdefault(kw, []).append(category)
+
+    automaton = ahocorasick.Automaton()
+    for kw, cats in owners.items():
+        automaton.add_word(kw, (kw, tuple(cats)))
+    automaton.make_automaton()
+    return automaton
+
+
+def keyword_hits(automaton, text):
+    """
+    Yields (keyword, categories) for each distinct keyword found in text,
+    in the order they appear
+    """
+    seen = set()
+    for _, (kw, categories) in automaton.iter(text):
+        if kw not in seen:
+            seen.add(kw)
+            yield kw, categories
+
+
+HEADER_AUTOMATON = build_keyword_automaton(HEADER_CATEGORIES)
+BODY_AUTOMATON = build_keyword_automaton(BODY_RULES)
+
+
 # --------------------------------------------------
 # CLASSIFICATION
 # --------------------------------------------------
 
 def classify_header(text):
 
-    scores = {}
+    hits = Counter()
+    for kw, categories in keyword_hits(HEADER_AUTOMATON, text):
+        hits.update(categories)
 
-    for category, keywords in HEADER_CATEGORIES.items():
-        score = 0
-        for kw in keywords:
-            if kw in text:
-                score += 1
-        if score > 0:
-            scores[category] = score
+    # keep declaration order so ties resolve as before
+    scores = Counter({
+        category: hits[category]
+        for category in HEADER_CATEGORIES
+        if hits[category] > 0
+    })
 
     if not scores:
         return None
 
-    return max(scores, key=scores.get)
+    return scores.most_common(1)[0][0]
 
 
 def refine_with_body(header_class, body_text):
@@ -191,8 +405,10 @@ def refine_with_body(header_class, body_text):
     if header_class not in BODY_RULES:
         return header_class
 
-    rule_keywords = BODY_RULES[header_class]
-    score = sum(1 for kw in rule_keywords if kw in body_text)
+    score = sum(
+        1 for kw, categories in keyword_hits(BODY_AUTOMATON, body_text)
+        if header_class in categories
+    )
 
     if score >= 2:
         return header_class
@@ -204,83 +420,98 @@ def refine_with_body(header_class, body_text):
 # MAIN PIPELINE
 # --------------------------------------------------
 
-def detect_medical_pages_2(image_dir, output_dir, progress_callback=None, debug=False):
+def process_page_2(img_path, debug=False, scanned=False):
+    """
+    OCR and classify a single page. Runs inside a worker process.
+    """
+    # decode straight to gray; every region below is a view into this
+    gray = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return img_path, None
+
+    # HEADER
+    header_text = extract_header_text(gray, scanned)
+    header_class = classify_header(header_text)
+
+    # FOOTER FALLBACK
+    footer_text = ""
+    if header_class is None or is_header_weak(header_text):
+        footer_text = extract_footer_text(gray, scanned)
+        footer_class = classify_header(footer_text)
+
+        if footer_class:
+            header_class = footer_class
+            if debug:
+                print("Used FOOTER instead of HEADER")
+
+    body_text = ""
+    if header_class is None:
+        # FULL PAGE LAST RESORT (its text covers the body as well)
+        full_text = ocr_gray(gray, scanned)
+        header_class = classify_header(full_text)
+        category = refine_with_body(header_class, full_text)
+    else:
+        # BODY CONFIRMATION
+        body_text = extract_body_text(gray, scanned)
+        category = refine_with_body(header_class, body_text)
+
+    # DEBUG
+    if debug:
+        print("\n==============================")
+        print("FILE:", os.path.basename(img_path))
+        print("HEADER TEXT:", header_text[:200])
+        print("FOOTER TEXT:", footer_text[:200])
+        print("BODY TEXT:", body_text[:200])
+        print("FINAL CLASS:", category)
+
+    return img_path, category
+
+
+def detect_medical_pages_2(image_dir, output_dir, progress_callback=None, debug=False, scanned=False, pdf_path=None, zip_writer=None, pool=None):
 
     os.makedirs(output_dir, exist_ok=True)
 
     # 🔥 CLEAN OLD OUTPUTS
-    for f in os.listdir(output_dir):
-        os.remove(os.path.join(output_dir, f))
+    for e in list_images(output_dir):
+        os.remove(e.path)
 
     found = []
     processed_pages = set()
+    paths = []
 
-    images = sorted(os.listdir(image_dir))
-    total = len(images)
-
-    for i, img_name in enumerate(images):
+    for e in list_images(image_dir):
 
-        img_path = os.path.join(image_dir, img_name)
-        img_hash = image_hash(img_path)
+        img_hash = image_hash(e.path)
 
         # 🔥 SKIP DUPLICATE PAGE
         if img_hash in processed_pages:
             if debug:
-                print("SKIPPED DUPLICATE:", img_name)
+                print("SKIPPED DUPLICATE:", e.name)
             continue
 
         processed_pages.add(img_hash)
+        paths.append(e.path)
 
-        img = cv2.imread(img_path)
-        if img is None:
-            continue
-
-        # HEADER
-        header_text = extract_header_text(img)
-        header_class = classify_header(header_text)
+    total = len(paths)
+    worker = partial(process_page_2, debug=debug, scanned=scanned)
 
-        # FOOTER FALLBACK
-        footer_text = ""
-        if header_class is None or is_header_weak(header_text):
-            footer_text = extract_footer_text(img)
-            footer_class = classify_header(footer_text)
+    # pages are independent, so OCR them in parallel and collect in order
+    _, chunksize = pool_sizing(total)
 
-            if footer_class:
-                header_class = footer_class
-                if debug:
-                    print("Used FOOTER instead of HEADER")
+    with ocr_pool(total, pool) as ex, open_pdf(pdf_path) as doc:
+        for i, (img_path, category) in enumerate(ex.map(worker, paths, chunksize=chunksize)):
 
-        # BODY CONFIRMATION
-        body_text = extract_body_text(img)
-        category = refine_with_body(header_class, body_text)
-
-        # FULL PAGE LAST RESORT
-        if category is None:
-            full_text = ocr_image(img)
-            header_class = classify_header(full_text)
-            category = refine_with_body(header_class, full_text)
-
-        # DEBUG
-        if debug:
-            print("\n==============================")
-            print("FILE:", img_name)
-            print("HASH:", img_hash)
-            print("HEADER TEXT:", header_text[:200])
-            print("FOOTER TEXT:", footer_text[:200])
-            print("BODY TEXT:", body_text[:200])
-            print("FINAL CLASS:", category)
-
-        # SAVE SINGLE RESULT ONLY
-        if category:
-            base_name = clean_filename(category)
-            page_number = os.path.splitext(img_name)[0]  # page_12
-            dst_path = os.path.join(output_dir, f"{page_number}_{base_name}.png")
-            # dst_path = os.path.join(output_dir, f"{img_hash}_{base_name}.png")
-            shutil.copy(img_path, dst_path)
-            found.append(dst_path)
+            # SAVE SINGLE RESULT ONLY
+            if category:
+                base_name = clean_filename(category)
+                page_number = os.path.splitext(os.path.basename(img_path))[0]  # page_12
+                dst_path = os.path.join(output_dir, f"{page_number}_{base_name}.png")
+                # dst_path = os.path.join(output_dir, f"{img_hash}_{base_name}.png")
+                save_page(img_path, dst_path, doc, zip_writer)
+                found.append(dst_path)
 
-        if progress_callback:
-            progress_callback((i + 1) / total)
+            if progress_callback:
+                progress_callback((i + 1) / total)
 
     return found
 
@@ -317,6 +548,10 @@ MEDICAL_CATEGORIES_1 = {
     },
 }
 
+MEDICAL_AUTOMATON_1 = build_keyword_automaton(
+    {category: data["keywords"] for category, data in MEDICAL_CATEGORIES_1.items()}
+)
+
 # ---------------- REGEX PATTERNS ----------------
 
 VITAL_REGEX_1 = re.compile(
@@ -338,30 +573,27 @@ def normalize_text_1(text: str) -> str:
     S P O 2 -> spo2
     """
     text = text.lower()
-    text = re.sub(r"\s+", " ", text)
-    text = text.replace("b p", "bp")
-    text = text.replace("b.p.", "bp")
-    text = text.replace("s p o 2", "spo2")
-    text = text.replace("t e m p", "temp")
+    text = WHITESPACE_REGEX.sub(" ", text)
+    text = OCR_FIX_REGEX.sub(lambda m: OCR_FIXES[m.group(0)], text)
     return text
 
 
 def clean_filename_1(text):
-    return re.sub(r'[^a-z0-9_]', '', text.lower().replace(" ", "_"))
+    return NON_FILENAME_REGEX.sub('', text.lower().replace(" ", "_"))
 
 
 def classify_text_1(text: str):
     """
     Returns best matching medical category or None
     """
-    scores = {}
+    hits = Counter()
+    for kw, categories in keyword_hits(MEDICAL_AUTOMATON_1, text):
+        hits.update(categories)
 
-    for category, data in MEDICAL_CATEGORIES_1.items():
-        score = 0
+    scores = Counter()
 
-        for kw in data["keywords"]:
-            if kw in text:
-                score += 1
+    for category, data in MEDICAL_CATEGORIES_1.items():
+        score = hits[category]
 
         # Pattern-based boosts
         if category == "drug_vital_chart_1" and VITAL_REGEX_1.search(text):
@@ -377,49 +609,60 @@ def classify_text_1(text: str):
         return None
 
     # Return strongest category
-    return max(scores, key=scores.get)
+    return scores.most_common(1)[0][0]
 
 # ---------------- MAIN PIPELINE ----------------
 
-def detect_medical_pages_1(image_dir, output_dir, progress_callback=None, debug=False):
-    os.makedirs(output_dir, exist_ok=True)
-    found = []
+def process_page_1(img_path, scanned=True):
+    """
+    OCR and classify a single page. Runs inside a worker process.
+    """
+    print(os.path.basename(img_path))
+    gray = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
 
-    images = sorted(os.listdir(image_dir))
-    total = len(images)
+    if gray is None:
+        return img_path, None
 
-    for i, img_name in enumerate(images):
-        img_path = os.path.join(image_dir, img_name)
-        print(img_name)
-        img = cv2.imread(img_path)
+    worker = get_ocr_worker()
+    gray = worker.preprocess(gray, scanned)
 
-        if img is None:
-            continue
+    if gray is None:
+        return img_path, None
+
+    raw_text = worker.image_to_string(gray)
+    text = normalize_text_1(raw_text)
+    print(text)
+
+    category = classify_text_1(text)
+    print(category)
 
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        gray = cv2.bilateralFilter(gray, 9, 75, 75)
+    return img_path, category
 
-        raw_text = pytesseract.image_to_string(gray, config="--oem 3 --psm 6")
-        text = normalize_text_1(raw_text)
-        print(text)
 
-        category = classify_text_1(text)
-        print(category)
+def detect_medical_pages_1(image_dir, output_dir, progress_callback=None, debug=False, scanned=True, pdf_path=None, zip_writer=None, pool=None):
+    os.makedirs(output_dir, exist_ok=True)
+    found = []
 
-        if category:
-            base_name = clean_filename_1(category)
-            dst_path = os.path.join(output_dir, f"{base_name}.png")
+    paths = [e.path for e in list_images(image_dir)]
+    total = len(paths)
+    worker = partial(process_page_1, scanned=scanned)
 
-            counter = 1
-            while os.path.exists(dst_path):
-                dst_path = os.path.join(output_dir, f"{base_name}_{counter}.png")
-                counter += 1
+    # pages are independent, so OCR them in parallel and collect in order
+    _, chunksize = pool_sizing(total)
 
-            shutil.copy(img_path, dst_path)
-            found.append(dst_path)
+    with ocr_pool(total, pool) as ex, open_pdf(pdf_path) as doc:
+        for i, (img_path, category) in enumerate(ex.map(worker, paths, chunksize=chunksize)):
+
+            if category:
+                base_name = clean_filename_1(category)
+                page_number = os.path.splitext(os.path.basename(img_path))[0]  # page_12
+                dst_path = os.path.join(output_dir, f"{page_number}_{base_name}.png")
 
-        if progress_callback:
-            progress_callback((i + 1) / total)
+                save_page(img_path, dst_path, doc, zip_writer)
+                found.append(dst_path)
+
+            if progress_callback:
+                progress_callback((i + 1) / total)
 
     return found
 
@@ -428,17 +671,35 @@ def detect_medical_pages_1(image_dir, output_dir, progress_callback=None, debug=
 
 
 
-def is_scanned_page(img, debug=False):
+def page_tiles(gray, size=512, count=3):
+    """
+    Native-resolution tiles spread down the middle of the page
+    """
+    h, w = gray.shape[:2]
+    th, tw = min(size, h), min(size, w)
+    x = (w - tw) // 2
+    for k in range(count):
+        y = (h - th) * (2 * k + 1) // (2 * count)
+        yield gray[y:y + th, x:x + tw]
+
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+def is_scanned_page(gray, debug=False):
 
-    # blur removes text, keeps background texture
-    blur = cv2.GaussianBlur(gray, (31,31), 0)
+    # measure on a few full-resolution tiles rather than the whole page;
+    # downscaling would average away the pixel grain we are looking for
+    diffs = []
+    for tile in page_tiles(gray):
 
-    # difference between original and smooth background
-    diff = cv2.absdiff(gray, blur)
+        # blur removes text, keeps background texture
+        blur = cv2.GaussianBlur(tile, (31,31), 0)
 
-    noise_score = np.std(diff)
+        # difference between original and smooth background
+        diffs.append(cv2.absdiff(tile, blur))
+
+    diff = np.vstack(diffs)
+
+    _, stddev = cv2.meanStdDev(diff)
+    noise_score = float(stddev[0, 0])
 
     if debug:
         print("Noise score:", noise_score)
@@ -446,13 +707,11 @@ def is_scanned_page(img, debug=False):
     # threshold determined empirically
     return noise_score > 9
 
-def detect_medical_pages(image_dir, output_dir, progress_callback=None, debug=False):
-
-    images = sorted(os.listdir(image_dir))
+def detect_medical_pages(image_dir, output_dir, progress_callback=None, debug=False, pdf_path=None, zip_writer=None, pool=None):
 
     decision_img = None
-    for img_name in images[:3]:
-        img = cv2.imread(os.path.join(image_dir, img_name))
+    for e in list_images(image_dir)[:3]:
+        img = cv2.imread(e.path, cv2.IMREAD_GRAYSCALE)
         if img is not None:
             decision_img = img
             break
@@ -465,8 +724,8 @@ def detect_medical_pages(image_dir, output_dir, progress_callback=None, debug=Fa
 
     if scanned:
         print("\nDOCUMENT TYPE → SCANNED → UNSTRUCTURED PIPELINE")
-        return detect_medical_pages_1(image_dir, output_dir, progress_callback, debug)
+        return detect_medical_pages_1(image_dir, output_dir, progress_callback, debug, scanned, pdf_path, zip_writer, pool)
 
     else:
         print("\nDOCUMENT TYPE → DIGITAL → STRUCTURED PIPELINE")
-        return detect_medical_pages_2(image_dir, output_dir, progress_callback, debug)
+        return detect_medical_pages_2(image_dir, output_dir, progress_callback, debug, scanned, pdf_path, zip_writer, pool)
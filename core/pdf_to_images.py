@@ -1,24 +1,65 @@
 import fitz
+import cv2
+import numpy as np
 import os
+from contextlib import nullcontext
+
+def iter_pdf_pages(doc, dpi=300):
+    """
+    Yields (page_index, RGB array) for every page of an open document,
+    rendered in memory
+    """
+    zoom = dpi / 72
+    mat = fitz.Matrix(zoom, zoom)
+
+    for i in range(len(doc)):
+        pix = doc.load_page(i).get_pixmap(matrix=mat)
+        yield i, np.frombuffer(pix.samples, np.uint8).reshape(pix.height, pix.width, pix.n)
+
+
+def open_pdf(pdf_path=None):
+    """
+    Source document for re-rendering, or None when there is no PDF
+    """
+    return fitz.open(pdf_path) if pdf_path else nullcontext()
+
+
+def rerender_page(doc, page_no, dpi=300):
+    """
+    Full-resolution pixmap of a single page, for saving matched pages
+    """
+    zoom = dpi / 72
+    return doc.load_page(page_no).get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+
+
+def page_index(img_path):
+    """
+    Page index of a page_<n>.png written by convert_pdf_to_images
+    """
+    name = os.path.splitext(os.path.basename(img_path))[0]
+    return int(name.rsplit("_", 1)[1]) - 1
+
 
 def convert_pdf_to_images(pdf_path, output_dir, progress_callback=None, dpi=300):
     os.makedirs(output_dir, exist_ok=True)
 
-    doc = fitz.open(pdf_path)
-    total_pages = len(doc)
     image_paths = []
 
-    for i in range(total_pages):
-        page = doc.load_page(i)
-        zoom = dpi / 72
-        mat = fitz.Matrix(zoom, zoom)
-        pix = page.get_pixmap(matrix=mat)
+    with fitz.open(pdf_path) as doc:
+        total_pages = len(doc)
+
+        for i, page in iter_pdf_pages(doc, dpi):
+            output_path = os.path.join(output_dir, f"page_{i+1}.png")
 
-        output_path = os.path.join(output_dir, f"page_{i+1}.png")
-        pix.save(output_path)
-        image_paths.append(output_path)
+            # scratch pages are read back once, so favour encode speed over size
+            cv2.imwrite(
+                output_path,
+                cv2.cvtColor(page, cv2.COLOR_RGB2BGR),
+                [cv2.IMWRITE_PNG_COMPRESSION, 1]
+            )
+            image_paths.append(output_path)
 
-        if progress_callback:
-            progress_callback((i + 1) / total_pages)
+            if progress_callback:
+                progress_callback((i + 1) / total_pages)
 
     return image_paths
@@ -1,4 +1,5 @@
-import shutil
+import zipfile
 
-def create_zip(folder_path, zip_name):
-    return shutil.make_archive(zip_name, 'zip', folder_path)
+def open_zip(zip_name):
+    # PNGs are already compressed, so store them without deflate
+    return zipfile.ZipFile(f"{zip_name}.zip", "w", zipfile.ZIP_STORED)